@@ -1,16 +1,24 @@
 import pandas as pd
+from typing import Optional
+from Sampling_APP import sample_users
 
 class DataCleaner:
     """Classe pour nettoyer et traiter les données de navigation des utilisateurs."""
     
-    def __init__(self, input_file: str):
+    def __init__(self, input_file: Optional[str] = None, sample_rate: Optional[float] = None,
+                 verbose: bool = True):
         """
         Initialise le DataCleaner.
         
         Args:
-            input_file (str): Chemin vers le fichier CSV d'entrée
+            input_file (Optional[str]): Chemin vers le fichier CSV d'entrée (inutile pour clean_batch)
+            sample_rate (Optional[float]): Fraction déterministe d'utilisateurs à conserver
+                (historiques complets); None pour tout garder
+            verbose (bool): Afficher le suivi des utilisateurs à chaque étape
         """
         self.input_file = input_file
+        self.sample_rate = sample_rate
+        self.verbose = verbose
         self.df = None
         self._setup_excluded_data()
         
@@ -69,15 +77,35 @@ class DataCleaner:
         self.df = self.df[~self.df["person.properties.email"].isin(self.excluded_emails)]
         self.df = self.df[self.df["person.properties.email"] != ""]
         
-        final_users = self.df["person.properties.email"].nunique()
-        print(f"Utilisateurs uniques - Initial: {initial_users}, Final: {final_users}")
+        if self.verbose:
+            final_users = self.df["person.properties.email"].nunique()
+            print(f"Utilisateurs uniques - Initial: {initial_users}, Final: {final_users}")
+    
+    def _sample_users(self):
+        """Ne garde qu'une fraction déterministe des utilisateurs, si demandé."""
+        if self.sample_rate is None or self.sample_rate >= 1:
+            return
+        
+        users_avant = self.df["person.properties.email"].nunique()
+        self.df = sample_users(self.df, self.sample_rate)
+        if self.verbose:
+            users_apres = self.df["person.properties.email"].nunique()
+            print(f"Échantillon de {self.sample_rate:.2%} des utilisateurs: "
+                  f"{users_apres} conservés, {users_avant - users_apres} hors échantillon")
     
     def _process_datetime(self):
         """Traite les champs de date et heure."""
         if "properties.$sent_at" not in self.df.columns:
             return
             
-        sent_at_split = self.df["properties.$sent_at"].str.split("T", expand=True)
+        # Toujours deux colonnes, même si aucune valeur ne contient d'heure (lot sans "T" ou vide)
+        sent_at_split = (
+            self.df["properties.$sent_at"]
+            .astype("string")
+            .str.split("T", n=1, expand=True)
+            .reindex(columns=[0, 1])
+            .astype("string")
+        )
         self.df[["properties.$sent_at", "start_time"]] = sent_at_split
         
         self.df["start_time"] = (
@@ -123,12 +151,39 @@ class DataCleaner:
             (self.df["start_time"] != "")
         )
         
+        self.df["datetime"] = pd.NaT
         self.df.loc[mask, "datetime"] = pd.to_datetime(
             self.df.loc[mask, "start_date"] + " " + self.df.loc[mask, "start_time"],
             format="%Y-%m-%d %H:%M:%S",
             errors="coerce"
         )
     
+    def clean_batch(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Applique les mêmes règles de nettoyage à un lot d'événements déjà chargé.
+        
+        Utilisé pour les micro-lots du mode temps réel: pas de lecture de fichier
+        ni de rapport par utilisateur, coût proportionnel à la taille du lot.
+        
+        Args:
+            df (pd.DataFrame): Événements bruts (mêmes colonnes que le CSV d'extraction)
+            
+        Returns:
+            pd.DataFrame: Lot nettoyé
+        """
+        if df.empty:
+            return df
+        self.df = df.copy()
+        self._process_emails()
+        self._sample_users()
+        self._process_datetime()
+        self._process_categories()
+        self._create_datetime()
+        self.df = self.df.drop_duplicates(
+            subset=["person.properties.email", "category", "datetime"]
+        )
+        return self.df
+    
     def clean_data(self) -> pd.DataFrame:
         """
         Nettoie et traite les données.
@@ -151,6 +206,10 @@ class DataCleaner:
             self._process_emails()
             users_apres_emails = set(self.df["person.properties.email"].unique())
             
+            # Les utilisateurs hors échantillon ne sont pas des exclusions: résumé sur une ligne
+            self._sample_users()
+            users_apres_echantillon = set(self.df["person.properties.email"].unique())
+            
             self._process_datetime()
             users_apres_datetime = set(self.df["person.properties.email"].unique())
             
@@ -179,7 +238,7 @@ class DataCleaner:
                 for user in exclus_emails:
                     print(f"- {user}")
                     
-            exclus_datetime = users_apres_emails - users_apres_datetime
+            exclus_datetime = users_apres_echantillon - users_apres_datetime
             if exclus_datetime:
                 print(f"\nExclus après traitement des dates ({len(exclus_datetime)}):")
                 for user in exclus_datetime:
@@ -208,6 +267,9 @@ class DataCleaner:
             print(f"Total utilisateurs initiaux: {len(users_initiaux)}")
             print(f"Total utilisateurs finaux: {len(users_finaux)}")
             print(f"Total utilisateurs exclus: {len(users_initiaux - users_finaux)}")
+            hors_echantillon = users_apres_emails - users_apres_echantillon
+            if hors_echantillon:
+                print(f"Dont hors échantillon: {len(hors_echantillon)}")
             
             return self.df
             
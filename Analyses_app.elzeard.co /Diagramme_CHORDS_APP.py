@@ -4,17 +4,24 @@ import plotly.graph_objects as go
 from collections import defaultdict
 import os
 import math
-from typing import Dict, Tuple
+from typing import Dict, Tuple, Optional
+from Sessionizer_APP import Sessionizer
+from Sampling_APP import sample_users, scale_factor
+from DistinctCounter_APP import DistinctUserCounter
 
 class ChordDiagramAnalyzer:
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, sample_rate: Optional[float] = None):
         self.file_path = file_path
+        self.sample_rate = sample_rate
+        self.scale = scale_factor(sample_rate)  # Factor para extrapolar los conteos de la muestra
         self.df = None
         self.transitions = defaultdict(lambda: defaultdict(int))
         self.categories = set()
         self.visit_counts = defaultdict(int)
         self.unique_users = set()
+        self.distinct_users = None  # DistinctUserCounter: usuarios distintos por día, categoría y grupo
         self.unregistered_paths = set()  # Nuevo conjunto para trackear paths no registrados
+        self.sessions = None
 
         # Definir los grupos y colores
         self.groups = {
@@ -66,9 +73,9 @@ class ChordDiagramAnalyzer:
         try:
             self.df = pd.read_csv(self.file_path)
             self.df['category'] = self.df['category'].astype(str)
+            self.df = sample_users(self.df, self.sample_rate)
             self.df = self.df.sort_values(['person.properties.email', 'datetime']).reset_index(drop=True)
             self.unique_users = set(self.df['person.properties.email'].unique())
-            self.visit_counts = self.df.groupby('category')['person.properties.email'].nunique().to_dict()
             
             # Actualizar el grupo 'Otros' con las categorías no registradas
             unregistered = set(self.df['category'].unique()) - set(self.category_to_group.keys())
@@ -76,29 +83,55 @@ class ChordDiagramAnalyzer:
             for category in unregistered:
                 self.category_to_group[category] = 'Otros'
                 self.category_to_color[category] = self.group_colors['Otros']
+
+            # Usuarios distintos por categoría, fusionables por rango de días sin releer los eventos
+            self.distinct_users = DistinctUserCounter(self.df, category_to_group=self.category_to_group)
+            self.visit_counts = self.distinct_users.counts('category')
+            if self.scale != 1:
+                self.visit_counts = {cat: round(count * self.scale) for cat, count in self.visit_counts.items()}
                 
         except Exception as e:
             print(f"Error al cargar los datos: {str(e)}")
             return None
 
-    def analyze_transitions(self):
+    def analyze_transitions(self, session_gap_minutes: Optional[float] = None):
+        """Cuenta las transiciones; si se da session_gap_minutes, solo dentro de cada sesión"""
         try:
-            categories = self.df['category'].tolist()
-            emails = self.df['person.properties.email'].tolist()
-
-            for i in range(len(categories) - 1):
-                if emails[i] == emails[i + 1]:
-                    source = categories[i]
-                    target = categories[i + 1]
-
-                    if source != target:
-                        self.transitions[source][target] += 1
+            if session_gap_minutes is not None:
+                sessionizer = Sessionizer(self.df, gap_minutes=session_gap_minutes)
+                sessionizer.sessionize()
+                self.sessions = sessionizer.sessions
+                for source, targets in sessionizer.transition_counts().items():
+                    for target, value in targets.items():
+                        self.transitions[source][target] += value
                         self.categories.add(source)
                         self.categories.add(target)
+            else:
+                categories = self.df['category'].tolist()
+                emails = self.df['person.properties.email'].tolist()
+
+                for i in range(len(categories) - 1):
+                    if emails[i] == emails[i + 1]:
+                        source = categories[i]
+                        target = categories[i + 1]
+
+                        if source != target:
+                            self.transitions[source][target] += 1
+                            self.categories.add(source)
+                            self.categories.add(target)
+
+            if self.scale != 1:
+                for source in self.transitions:
+                    for target in self.transitions[source]:
+                        self.transitions[source][target] = round(self.transitions[source][target] * self.scale)
 
             print(f"\nAnálisis completado:")
             print(f"Número de categorías únicas: {len(self.categories)}")
             print(f"Número de usuarios únicos identificados: {len(self.unique_users)}")
+            if self.scale != 1:
+                print(f"Conteos extrapolados desde una muestra del {self.sample_rate:.2%} de usuarios")
+            if self.sessions is not None:
+                print(f"Número de sesiones identificadas: {len(self.sessions)}")
 
             
             if self.unregistered_paths:
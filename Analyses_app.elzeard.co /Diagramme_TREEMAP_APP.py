@@ -1,25 +1,30 @@
 import pandas as pd
 import plotly.graph_objects as go
 from collections import defaultdict
-import plotly.io as pio
 import os
-
-pio.renderers.default = "browser"
+from typing import Optional
+from Sampling_APP import sample_users, scale_factor
+from DistinctCounter_APP import DistinctUserCounter
 
 class TemporalFlow:
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, sample_rate: Optional[float] = None):
         self.file_path = file_path
+        self.sample_rate = sample_rate
+        self.scale = scale_factor(sample_rate)
         self.df = None
         self.transitions = defaultdict(int)
         self.categories = set()
+        self.distinct_users = None
 
     def load_data(self):
         try:
             self.df = pd.read_csv(self.file_path)
             self.df['datetime'] = pd.to_datetime(self.df['datetime'], errors='coerce')
             self.df['category'] = self.df['category'].astype(str)
+            self.df = sample_users(self.df, self.sample_rate)
             self.df = self.df.sort_values(['person.properties.email', 'datetime']).reset_index(drop=True)
             self.categories = set(self.df['category'].unique())
+            self.distinct_users = DistinctUserCounter(self.df)
         except Exception as e:
             print(f"Error loading data: {str(e)}")
 
@@ -63,21 +68,22 @@ class TemporalFlow:
             for group_name in groups.keys():
                 labels.append(group_name)
                 parents.append('')
-                total_visits = len(self.df[self.df['category'].isin(groups[group_name])])
+                total_visits = round(len(self.df[self.df['category'].isin(groups[group_name])]) * self.scale)
                 values.append(total_visits)
                 hover_texts.append(f"{group_name}<br>Total Visits: {total_visits}")
                 colors.append(group_colors.get(group_name, '#000000'))  # Default to black if not found
 
             # Agregar las categorías dentro de cada grupo
+            unique_users_by_category = self.distinct_users.counts('category')
             for group_name, categories in groups.items():
                 for category in categories:
                     if category in self.df['category'].unique():
                         labels.append(category)
                         parents.append(group_name)
-                        total_visits = len(self.df[self.df['category'] == category])
-                        unique_users = len(self.df[self.df['category'] == category]['person.properties.email'].unique())
-                        transitions_out = sum(self.transitions.get((category, cat), 0) for cat in self.categories if cat != category)
-                        transitions_in = sum(self.transitions.get((cat, category), 0) for cat in self.categories if cat != category)
+                        total_visits = round(len(self.df[self.df['category'] == category]) * self.scale)
+                        unique_users = round(unique_users_by_category.get(category, 0) * self.scale)
+                        transitions_out = round(sum(self.transitions.get((category, cat), 0) for cat in self.categories if cat != category) * self.scale)
+                        transitions_in = round(sum(self.transitions.get((cat, category), 0) for cat in self.categories if cat != category) * self.scale)
                         
                         hover_text = (f"Category: {category}<br>"
                                       f"Total Visits: {total_visits}<br>"
@@ -0,0 +1,304 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional
+
+
+def hash_values(values) -> np.ndarray:
+    """Hache des valeurs (emails) en entiers 64 bits, de façon déterministe et vectorisée."""
+    return pd.util.hash_array(np.asarray(values, dtype=object))
+
+
+def _leading_zeros(words: np.ndarray) -> np.ndarray:
+    """Nombre de zéros en tête de mots de 64 bits (64 pour un mot nul)."""
+    words = words.astype(np.uint64)
+    high = (words >> np.uint64(32)).astype(np.float64)
+    low = (words & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    # Les moitiés de 32 bits sont représentées exactement en float64
+    with np.errstate(divide="ignore"):
+        zeros = np.where(
+            high > 0,
+            31 - np.floor(np.log2(np.maximum(high, 1))),
+            63 - np.floor(np.log2(np.maximum(low, 1))),
+        )
+    zeros = np.where((high == 0) & (low == 0), 64, zeros)
+    return zeros.astype(np.int64)
+
+
+def hll_positions(hashes: np.ndarray, precision: int):
+    """Retourne (registre, rang) HyperLogLog de chaque hachage."""
+    hashes = hashes.astype(np.uint64)
+    index = (hashes >> np.uint64(64 - precision)).astype(np.int64)
+    remaining = hashes << np.uint64(precision)
+    rank = np.minimum(_leading_zeros(remaining) + 1, 64 - precision + 1)
+    return index, rank.astype(np.uint8)
+
+
+def hll_estimate(registers: np.ndarray) -> np.ndarray:
+    """
+    Estime la cardinalité à partir de registres HyperLogLog (dernier axe = registres).
+
+    Applique la correction « linear counting » pour les petites cardinalités.
+    """
+    registers = np.asarray(registers)
+    m = registers.shape[-1]
+    alpha = 0.7213 / (1 + 1.079 / m)
+    raw = alpha * m * m / np.sum(np.exp2(-registers.astype(np.float64)), axis=-1)
+    zeros = np.sum(registers == 0, axis=-1)
+    with np.errstate(divide="ignore"):
+        linear = m * np.log(m / np.maximum(zeros, 1))
+    return np.where((raw <= 2.5 * m) & (zeros > 0), linear, raw)
+
+
+class HyperLogLog:
+    """Sketch fusionnable pour compter des éléments distincts."""
+
+    def __init__(self, precision: int = 12, exact: bool = False):
+        """
+        Initialise le sketch.
+
+        Args:
+            precision (int): p, le sketch utilise 2**p registres d'un octet;
+                erreur relative type ≈ 1.04 / sqrt(2**p) (1.6 % pour p=12)
+            exact (bool): Conserver les hachages pour un comptage exact (petits volumes)
+        """
+        if not 4 <= precision <= 18:
+            raise ValueError("precision doit être comprise entre 4 et 18.")
+        self.precision = precision
+        self.exact = exact
+        self.registers = np.zeros(2 ** precision, dtype=np.uint8)
+        self.hashes = np.empty(0, dtype=np.uint64) if exact else None
+
+    @property
+    def relative_error(self) -> float:
+        """Erreur relative type de l'estimation (0 en mode exact)."""
+        return 0.0 if self.exact else 1.04 / np.sqrt(2 ** self.precision)
+
+    def add(self, values):
+        """Ajoute des valeurs (emails) au sketch."""
+        self.add_hashes(hash_values(values))
+        return self
+
+    def add_hashes(self, hashes: np.ndarray):
+        """Ajoute des valeurs déjà hachées au sketch."""
+        index, rank = hll_positions(hashes, self.precision)
+        np.maximum.at(self.registers, index, rank)
+        if self.exact:
+            self.hashes = np.union1d(self.hashes, hashes.astype(np.uint64))
+        return self
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        """Fusionne un autre sketch de même précision dans celui-ci."""
+        if other.precision != self.precision:
+            raise ValueError("Impossible de fusionner des sketches de précisions différentes.")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        if self.exact and other.exact:
+            self.hashes = np.union1d(self.hashes, other.hashes)
+        else:
+            self.exact = False
+            self.hashes = None
+        return self
+
+    def count(self) -> int:
+        """Nombre estimé (ou exact) d'éléments distincts."""
+        if self.exact:
+            return len(self.hashes)
+        return int(round(float(hll_estimate(self.registers))))
+
+
+class DistinctUserCounter:
+    """
+    Utilisateurs distincts par jour et par catégorie, groupe ou total, via des sketches fusionnables.
+
+    En mode approché, une plage de jours coûte une fusion de registres, quel que soit le
+    volume d'événements. En mode exact (petits volumes), les couples (jour, clé, utilisateur)
+    sont dédupliqués et triés par jour une fois pour toutes: une plage se lit comme une
+    tranche contiguë, au coût du nombre d'utilisateurs-jours qu'elle contient, et les
+    comptes sur toute la période sont précalculés.
+    """
+
+    DIMENSIONS = ("total", "category", "group")
+
+    def __init__(self, df: pd.DataFrame, category_to_group: Optional[Dict[str, str]] = None,
+                 precision: int = 12, exact: Optional[bool] = None, exact_threshold: int = 200_000,
+                 user_col: str = "person.properties.email",
+                 category_col: str = "category",
+                 datetime_col: str = "datetime"):
+        """
+        Initialise le compteur et construit les sketches.
+
+        Args:
+            df (pd.DataFrame): Données nettoyées (sortie de DataCleaner)
+            category_to_group (Optional[Dict[str, str]]): Catégorie -> groupe (ex.
+                ChordDiagramAnalyzer.category_to_group); les inconnues vont dans 'Otros'
+            precision (int): Précision HyperLogLog (voir HyperLogLog)
+            exact (Optional[bool]): Forcer le mode exact ou approché; par défaut exact
+                si le nombre d'événements est inférieur à `exact_threshold`
+            exact_threshold (int): Seuil d'événements pour le mode exact automatique
+        """
+        self.precision = precision
+        self.exact = exact if exact is not None else len(df) <= exact_threshold
+        self.category_to_group = category_to_group or {}
+        self.user_col = user_col
+        self.category_col = category_col
+        self.datetime_col = datetime_col
+        self.days = None
+        self.keys = {}
+        self.registers = {}
+        self.hashes = {}
+        self.full_counts = {}
+        self._build(df)
+
+    @property
+    def relative_error(self) -> float:
+        """Erreur relative type des comptes (0 en mode exact)."""
+        return 0.0 if self.exact else 1.04 / np.sqrt(2 ** self.precision)
+
+    def _build(self, df: pd.DataFrame):
+        """Calcule les registres (ou hachages exacts) par jour et par clé en une passe."""
+        timestamps = df[self.datetime_col]
+        if not pd.api.types.is_datetime64_any_dtype(timestamps):
+            timestamps = pd.to_datetime(timestamps, errors="coerce")
+        days = timestamps.to_numpy(dtype="datetime64[ns]").astype("datetime64[D]")
+        valid = ~np.isnat(days) & df[self.user_col].notna().to_numpy()
+
+        days = days[valid]
+        hashes = hash_values(df[self.user_col].to_numpy()[valid])
+        categories = df[self.category_col].astype(str).to_numpy()[valid]
+        groups = pd.Series(categories).map(self.category_to_group).fillna("Otros").to_numpy()
+
+        day_codes, self.days = pd.factorize(days, sort=True)
+        self.days = np.asarray(self.days, dtype="datetime64[D]")
+        index, rank = hll_positions(hashes, self.precision)
+        m = 2 ** self.precision
+
+        for dimension, values in (("total", np.full(len(days), "all", dtype=object)),
+                                  ("category", categories),
+                                  ("group", groups)):
+            key_codes, keys = pd.factorize(values, sort=True)
+            self.keys[dimension] = pd.Index(keys)
+            n_keys = len(keys)
+
+            registers = np.zeros(len(self.days) * n_keys * m, dtype=np.uint8)
+            np.maximum.at(registers, (day_codes * n_keys + key_codes) * m + index, rank)
+            self.registers[dimension] = registers.reshape(len(self.days), n_keys, m)
+
+            if self.exact:
+                self.hashes[dimension] = self._sorted_pairs(pd.DataFrame({
+                    "day": self.days[day_codes] if len(day_codes) else np.empty(0, dtype="datetime64[D]"),
+                    "key": keys.take(key_codes) if len(key_codes) else np.empty(0, dtype=object),
+                    "hash": hashes,
+                }))
+        self._count_full_range()
+
+    @staticmethod
+    def _sorted_pairs(pairs: pd.DataFrame) -> pd.DataFrame:
+        """Déduplique les couples (jour, clé, hachage) et les trie par jour pour les lire par tranche."""
+        return pairs.drop_duplicates().sort_values("day", kind="mergesort").reset_index(drop=True)
+
+    def _count_full_range(self):
+        """Précalcule les comptes exacts sur toute la période (cas le plus fréquent)."""
+        self.full_counts = {}
+        if self.exact:
+            for dimension in self.DIMENSIONS:
+                self.full_counts[dimension] = self._exact_counts(dimension, 0, len(self.days))
+
+    def _pairs_in_range(self, dimension: str, first: int, stop: int) -> pd.DataFrame:
+        """Couples (jour, clé, hachage) des jours [first, stop), par tranche sur le tri par jour."""
+        pairs = self.hashes[dimension]
+        if first >= stop:
+            return pairs.iloc[:0]
+        days = pairs["day"].to_numpy(dtype="datetime64[D]")
+        lower = np.searchsorted(days, self.days[first], side="left")
+        upper = np.searchsorted(days, self.days[stop - 1], side="right")
+        return pairs.iloc[lower:upper]
+
+    def _exact_counts(self, dimension: str, first: int, stop: int) -> Dict[str, int]:
+        exact_counts = self._pairs_in_range(dimension, first, stop).groupby("key")["hash"].nunique()
+        return {key: int(exact_counts.get(key, 0)) for key in self.keys[dimension]}
+
+    def _day_range(self, start=None, end=None):
+        """Indices [début, fin) des jours compris entre start et end (inclus)."""
+        first = 0 if start is None else int(np.searchsorted(self.days, np.datetime64(pd.Timestamp(start).date(), "D")))
+        stop = len(self.days) if end is None else int(
+            np.searchsorted(self.days, np.datetime64(pd.Timestamp(end).date(), "D"), side="right")
+        )
+        return first, max(first, stop)
+
+    def counts(self, dimension: str = "category", start=None, end=None) -> Dict[str, int]:
+        """
+        Utilisateurs distincts par clé sur une plage de jours.
+
+        En mode approché, le coût est une fusion (maximum) des registres des jours concernés,
+        sans relire les événements; en mode exact, voir la classe.
+
+        Args:
+            dimension (str): 'total', 'category' ou 'group'
+            start: Premier jour inclus (None = début)
+            end: Dernier jour inclus (None = fin)
+
+        Returns:
+            Dict[str, int]: clé -> nombre d'utilisateurs distincts
+        """
+        if dimension not in self.DIMENSIONS:
+            raise ValueError(f"Dimension inconnue: {dimension}")
+        first, stop = self._day_range(start, end)
+        keys = self.keys[dimension]
+
+        if self.exact:
+            if (first, stop) == (0, len(self.days)):
+                return dict(self.full_counts[dimension])
+            return self._exact_counts(dimension, first, stop)
+
+        merged = self.registers[dimension][first:stop].max(axis=0, initial=0)
+        estimates = hll_estimate(merged) if len(keys) else []
+        return {key: int(round(float(value))) for key, value in zip(keys, estimates)}
+
+    def count(self, dimension: str = "total", key: str = "all", start=None, end=None) -> int:
+        """Utilisateurs distincts pour une clé donnée sur une plage de jours."""
+        return self.counts(dimension, start, end).get(key, 0)
+
+    def sketch(self, dimension: str = "total", key: str = "all", start=None, end=None) -> HyperLogLog:
+        """Sketch fusionné d'une clé sur une plage de jours, réutilisable pour d'autres fusions."""
+        first, stop = self._day_range(start, end)
+        result = HyperLogLog(self.precision, exact=self.exact)
+        if key in self.keys[dimension]:
+            position = self.keys[dimension].get_loc(key)
+            result.registers = self.registers[dimension][first:stop, position].max(axis=0, initial=0)
+        if self.exact:
+            pairs = self._pairs_in_range(dimension, first, stop)
+            result.hashes = np.unique(pairs.loc[pairs["key"] == key, "hash"].to_numpy(dtype=np.uint64))
+        return result
+
+    def merge(self, other: "DistinctUserCounter") -> "DistinctUserCounter":
+        """
+        Fusionne les sketches d'une autre partition (autres jours ou autres données).
+
+        Les jours et clés sont alignés puis les registres combinés par maximum.
+        """
+        if other.precision != self.precision:
+            raise ValueError("Impossible de fusionner des compteurs de précisions différentes.")
+        days = np.union1d(self.days, other.days)
+        m = 2 ** self.precision
+
+        for dimension in self.DIMENSIONS:
+            keys = self.keys[dimension].union(other.keys[dimension])
+            registers = np.zeros((len(days), len(keys), m), dtype=np.uint8)
+            for source in (self, other):
+                day_positions = np.searchsorted(days, source.days)
+                key_positions = keys.get_indexer(source.keys[dimension])
+                target = registers[np.ix_(day_positions, key_positions)]
+                registers[np.ix_(day_positions, key_positions)] = np.maximum(target, source.registers[dimension])
+            self.keys[dimension] = keys
+            self.registers[dimension] = registers
+
+            if self.exact and other.exact:
+                self.hashes[dimension] = self._sorted_pairs(
+                    pd.concat([self.hashes[dimension], other.hashes[dimension]], ignore_index=True)
+                )
+
+        if not (self.exact and other.exact):
+            self.exact = False
+            self.hashes = {}
+        self.days = days
+        self._count_full_range()
+        return self
@@ -0,0 +1,92 @@
+import gzip
+import html
+import os
+import plotly
+from typing import Dict, List
+
+# Nom versionné: après une mise à jour de plotly, les nouvelles pages ne chargent pas l'ancien bundle
+PLOTLY_ASSET = f"plotly-{plotly.__version__}.min.js"
+
+
+class FigureExporter:
+    """Exporte les figures plotly sans navigateur, avec un seul plotly.js partagé par version."""
+
+    FORMATS = ("html", "json")
+
+    def __init__(self, output_dir: str, export_format: str = "html", compress: bool = False):
+        """
+        Initialise le FigureExporter.
+
+        Args:
+            output_dir (str): Dossier de sortie des figures
+            export_format (str): 'html' (page légère référençant PLOTLY_ASSET) ou 'json'
+            compress (bool): Écrire des fichiers .gz
+        """
+        if export_format not in self.FORMATS:
+            raise ValueError(f"Format d'export inconnu: {export_format}")
+        self.output_dir = output_dir
+        self.export_format = export_format
+        self.compress = compress
+        self.written: List[str] = []
+
+    def _write(self, path: str, content: str) -> str:
+        """Écrit le contenu, compressé si demandé, et retourne le chemin final."""
+        if self.compress:
+            path += ".gz"
+            with gzip.open(path, "wt", encoding="utf-8") as file:
+                file.write(content)
+        else:
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(content)
+        self.written.append(path)
+        return path
+
+    def write_plotlyjs(self) -> str:
+        """Écrit une seule fois, par version de plotly, le bundle plotly.js partagé par toutes les pages HTML."""
+        path = os.path.join(self.output_dir, PLOTLY_ASSET)
+        if not os.path.exists(path):
+            from plotly.offline import get_plotlyjs
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(get_plotlyjs())
+        return path
+
+    def export(self, fig, name: str) -> str:
+        """
+        Exporte une figure sous `name` (sans extension).
+
+        Returns:
+            str: Chemin du fichier écrit
+        """
+        if self.export_format == "json":
+            return self._write(os.path.join(self.output_dir, f"{name}.json"), fig.to_json())
+
+        # Le navigateur ne décompresse pas un .js.gz servi en fichier local: l'asset reste en clair
+        self.write_plotlyjs()
+        content = fig.to_html(include_plotlyjs=PLOTLY_ASSET, full_html=True)
+        return self._write(os.path.join(self.output_dir, f"{name}.html"), content)
+
+    def write_report(self, figures: Dict[str, object], name: str = "report") -> str:
+        """
+        Regroupe plusieurs figures dans une seule page HTML.
+
+        Args:
+            figures (Dict[str, object]): Titre de section -> figure plotly
+            name (str): Nom du fichier (sans extension)
+
+        Returns:
+            str: Chemin du rapport écrit
+        """
+        self.write_plotlyjs()
+        sections = []
+        for title, fig in figures.items():
+            sections.append(
+                f"<section><h2>{html.escape(title)}</h2>\n"
+                f"{fig.to_html(include_plotlyjs=False, full_html=False)}\n</section>"
+            )
+        content = (
+            "<!DOCTYPE html>\n<html>\n<head>\n<meta charset=\"utf-8\" />\n"
+            f"<script src=\"{PLOTLY_ASSET}\"></script>\n</head>\n<body>\n"
+            + "\n".join(sections)
+            + "\n</body>\n</html>\n"
+        )
+        return self._write(os.path.join(self.output_dir, f"{name}.html"), content)
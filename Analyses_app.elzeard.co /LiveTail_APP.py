@@ -0,0 +1,370 @@
+import json
+import os
+import select
+import time
+import numpy as np
+import pandas as pd
+from collections import defaultdict
+from datetime import datetime
+from typing import Callable, Dict, Optional
+from DataCleaner_APP import DataCleaner
+from Sampling_APP import scale_factor
+
+MIN_UUID = "00000000-0000-0000-0000-000000000000"
+LIVE_STATE_FILE = "live_state.json"
+
+
+class IncrementalAnalytics:
+    """Transitions et agrégats par catégorie mis à jour lot par lot."""
+
+    def __init__(self, session_gap_minutes: Optional[float] = None,
+                 sample_rate: Optional[float] = None,
+                 user_col: str = "person.properties.email",
+                 category_col: str = "category",
+                 datetime_col: str = "datetime"):
+        """
+        Initialise les compteurs incrémentaux.
+
+        Args:
+            session_gap_minutes (Optional[float]): Si défini, une transition n'est comptée
+                que si les deux pages sont séparées de moins de ce délai (voir Sessionizer)
+            sample_rate (Optional[float]): Taux d'échantillonnage appliqué par le DataCleaner;
+                les comptes restent bruts et sont extrapolés dans apply_to
+            user_col (str): Colonne identifiant l'utilisateur
+            category_col (str): Colonne de la catégorie visitée
+            datetime_col (str): Colonne de l'horodatage de l'événement
+        """
+        self.gap = pd.Timedelta(minutes=session_gap_minutes).to_timedelta64() if session_gap_minutes is not None else None
+        self.sample_rate = sample_rate
+        self.scale = scale_factor(sample_rate)
+        self.user_col = user_col
+        self.category_col = category_col
+        self.datetime_col = datetime_col
+        self.transitions = defaultdict(lambda: defaultdict(int))
+        self.categories = set()
+        self.page_views = defaultdict(int)
+        self.users_by_category = defaultdict(set)
+        self.last_seen = {}  # utilisateur -> (catégorie, datetime) du dernier événement traité
+        self.events_processed = 0
+        self.last_update = None
+
+    @property
+    def visit_counts(self) -> Dict[str, int]:
+        """Utilisateurs distincts par catégorie (même sens que ChordDiagramAnalyzer.visit_counts)."""
+        return {category: len(users) for category, users in self.users_by_category.items()}
+
+    def update(self, events: pd.DataFrame):
+        """
+        Intègre un lot nettoyé, en O(taille du lot).
+
+        Le premier événement de chaque utilisateur dans le lot est enchaîné avec sa
+        dernière catégorie connue, pour compter correctement les transitions à cheval
+        sur deux lots. Les événements sont traités dans leur ordre d'arrivée entre lots.
+        """
+        if events.empty:
+            return
+
+        df = events[[self.user_col, self.category_col, self.datetime_col]].copy()
+        df[self.category_col] = df[self.category_col].astype(str)
+        df[self.datetime_col] = pd.to_datetime(df[self.datetime_col], errors="coerce")
+        df = df.sort_values([self.user_col, self.datetime_col], kind="mergesort")
+
+        users = df[self.user_col].to_numpy(dtype=object)
+        categories = df[self.category_col].to_numpy(dtype=object)
+        timestamps = df[self.datetime_col].to_numpy(dtype="datetime64[ns]")
+
+        for category, count in df[self.category_col].value_counts().items():
+            self.page_views[category] += int(count)
+        for category, category_users in df.groupby(self.category_col)[self.user_col].unique().items():
+            self.users_by_category[category].update(category_users)
+        self.categories.update(df[self.category_col].unique())
+
+        # Événement précédent de chaque ligne: dans le lot, ou le dernier vu pour la première ligne
+        first = np.ones(len(df), dtype=bool)
+        first[1:] = users[1:] != users[:-1]
+        previous_categories = np.empty(len(df), dtype=object)
+        previous_categories[1:] = categories[:-1]
+        previous_timestamps = np.empty(len(df), dtype="datetime64[ns]")
+        previous_timestamps[1:] = timestamps[:-1]
+
+        first_positions = np.flatnonzero(first)
+        for position in first_positions:
+            category, timestamp = self.last_seen.get(users[position], (None, np.datetime64("NaT")))
+            previous_categories[position] = category
+            previous_timestamps[position] = timestamp
+
+        mask = pd.notna(previous_categories) & (previous_categories != categories)
+        if self.gap is not None:
+            mask &= (timestamps - previous_timestamps) <= self.gap
+
+        pairs = pd.DataFrame({"source": previous_categories[mask], "target": categories[mask]})
+        for (source, target), count in pairs.value_counts().items():
+            self.transitions[source][target] += int(count)
+            self.categories.add(source)
+
+        last_positions = np.append(first_positions[1:], len(df)) - 1
+        for position in last_positions:
+            self.last_seen[users[position]] = (categories[position], timestamps[position])
+
+        self.events_processed += len(df)
+        self.last_update = datetime.now()
+
+    def apply_to(self, analyzer):
+        """
+        Copie l'état courant dans un ChordDiagramAnalyzer pour tracer le diagramme sans relire de fichier.
+
+        Comme les autres analyseurs, les comptes sont extrapolés par 1 / taux d'échantillonnage.
+        """
+        analyzer.transitions = defaultdict(lambda: defaultdict(int))
+        for source, targets in self.transitions.items():
+            for target, value in targets.items():
+                analyzer.transitions[source][target] = round(value * self.scale)
+        analyzer.categories = set(analyzer.transitions) | {
+            target for targets in analyzer.transitions.values() for target in targets
+        }
+        analyzer.visit_counts = {category: round(count * self.scale) for category, count in self.visit_counts.items()}
+        analyzer.sample_rate = self.sample_rate
+        analyzer.scale = self.scale
+        analyzer.unique_users = set(self.last_seen)
+        return analyzer
+
+
+def write_live_state(output_dir: str, analytics: IncrementalAnalytics, fig) -> str:
+    """
+    Écrit l'état courant du suivi (compteurs et diagramme) lu par la vue en direct du dashboard.
+
+    Le fichier est remplacé atomiquement pour que le dashboard ne lise jamais un état partiel.
+
+    Returns:
+        str: Chemin du fichier écrit
+    """
+    path = os.path.join(output_dir, LIVE_STATE_FILE)
+    state = {
+        "updated_at": analytics.last_update.isoformat() if analytics.last_update else None,
+        "events_processed": analytics.events_processed,
+        "users": round(len(analytics.last_seen) * analytics.scale),
+        "categories": len(analytics.categories),
+        "sample_rate": analytics.sample_rate,
+        "figure": json.loads(fig.to_json()),
+    }
+    temporary = f"{path}.tmp"
+    with open(temporary, "w", encoding="utf-8") as file:
+        json.dump(state, file)
+    os.replace(temporary, path)
+    return path
+
+
+class DataFrameEventSource:
+    """Source d'événements en mémoire qui rejoue un DataFrame brut par lots (tests, démonstrations)."""
+
+    connection_errors = ()
+
+    def __init__(self, df: pd.DataFrame, batch_size: int = 1000):
+        self.df = df
+        self.batch_size = batch_size
+        self.position = 0
+
+    @property
+    def exhausted(self) -> bool:
+        return self.position >= len(self.df)
+
+    def open(self):
+        pass
+
+    def fetch(self) -> pd.DataFrame:
+        batch = self.df.iloc[self.position:self.position + self.batch_size]
+        self.position += len(batch)
+        return batch
+
+    def wait(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class PostgresEventSource:
+    """
+    Lit les nouveaux événements de public.events par curseur (timestamp, uuid).
+
+    Si la requête configure un `notify_channel`, la source s'abonne par LISTEN et se
+    réveille dès qu'une notification arrive (un trigger doit alors émettre NOTIFY à
+    l'insertion); sinon elle interroge la base toutes les `poll_interval` secondes.
+    """
+
+    exhausted = False
+
+    def __init__(self, extractor, query_name: str = "user_navigation_tail",
+                 start: Optional[str] = None, batch_size: int = 5000, poll_interval: float = 2.0):
+        """
+        Args:
+            extractor (DataExtractor): Fournit la configuration et la connexion PostgreSQL
+            query_name (str): Requête de queries.json paramétrée par (timestamp, uuid, limite)
+            start (Optional[str]): Date 'YYYY-MM-DD' de départ du curseur (défaut: maintenant)
+            batch_size (int): Nombre maximal d'événements par lot
+            poll_interval (float): Attente maximale entre deux lectures, en secondes
+        """
+        self.extractor = extractor
+        self.query_config = extractor.queries_config.get(query_name) if extractor.queries_config else None
+        if not self.query_config:
+            raise ValueError(f"Query configuration not found for: {query_name}")
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.position = (datetime.strptime(start, "%Y-%m-%d") if start else datetime.now(), MIN_UUID)
+        self.listening = False
+
+    @property
+    def connection_errors(self) -> tuple:
+        """Erreurs qui signalent une connexion perdue: il faut rouvrir la source, pas réessayer."""
+        import psycopg2
+        return (psycopg2.OperationalError, psycopg2.InterfaceError, ConnectionError)
+
+    def open(self):
+        """Ouvre la connexion et s'abonne au canal; rappelée à chaque reconnexion (le curseur est conservé)."""
+        self.listening = False
+        if not self.extractor.connect():
+            raise ConnectionError("Could not connect to PostgreSQL database")
+        self.extractor.connection.autocommit = True
+
+        channel = self.query_config.get("notify_channel")
+        if channel:
+            from psycopg2 import sql
+            try:
+                self.extractor.cursor.execute(sql.SQL("LISTEN {}").format(sql.Identifier(channel)))
+                self.listening = True
+                print(f"Listening for notifications on channel: {channel}")
+            except Exception as error:
+                print(f"LISTEN unavailable, falling back to polling: {error}")
+
+    def fetch(self) -> pd.DataFrame:
+        headers = self.query_config["headers"]
+        self.extractor.cursor.execute(self.query_config["query"], (*self.position, self.batch_size))
+        rows = self.extractor.cursor.fetchall()
+        if rows:
+            last = dict(zip(headers, rows[-1]))
+            self.position = (last["timestamp"], str(last["uuid"]))
+        return pd.DataFrame(rows, columns=headers)
+
+    def wait(self):
+        if not self.listening:
+            time.sleep(self.poll_interval)
+            return
+        connection = self.extractor.connection
+        try:
+            if select.select([connection], [], [], self.poll_interval) != ([], [], []):
+                connection.poll()
+                connection.notifies.clear()
+        except (*self.connection_errors, OSError, ValueError):
+            # Connexion coupée pendant l'attente: la prochaine lecture le signalera et reconnectera
+            time.sleep(self.poll_interval)
+
+    def close(self):
+        try:
+            self.extractor.close()
+        except self.connection_errors as error:
+            print(f"Error closing PostgreSQL connection: {error}")
+
+
+class LiveTail:
+    """Boucle d'ingestion: lit un lot, le nettoie avec DataCleaner et met à jour les agrégats."""
+
+    def __init__(self, source, cleaner: Optional[DataCleaner] = None,
+                 analytics: Optional[IncrementalAnalytics] = None,
+                 max_reconnects: int = 5, reconnect_delay: float = 1.0):
+        """
+        Args:
+            source: Source d'événements (PostgresEventSource, DataFrameEventSource)
+            cleaner (Optional[DataCleaner]): Nettoyage appliqué à chaque lot
+            analytics (Optional[IncrementalAnalytics]): Agrégats mis à jour
+            max_reconnects (int): Nombre de pertes de connexion consécutives tolérées avant abandon
+            reconnect_delay (float): Délai avant la première reconnexion, doublé à chaque échec (max 60 s)
+        """
+        self.source = source
+        self.cleaner = cleaner or DataCleaner(verbose=False)
+        self.analytics = analytics or IncrementalAnalytics()
+        self.max_reconnects = max_reconnects
+        self.reconnect_delay = reconnect_delay
+        self.failed_batches = 0
+        self.failed_events = 0
+        self.reconnects = 0
+
+    def process_batch(self) -> int:
+        """
+        Traite un lot et retourne le nombre d'événements bruts lus.
+
+        Le curseur de la source a déjà avancé: un lot qui ne peut pas être nettoyé
+        est journalisé et compté, sans interrompre le suivi.
+        """
+        raw = self.source.fetch()
+        if raw.empty:
+            return 0
+        try:
+            self.analytics.update(self.cleaner.clean_batch(raw))
+        except Exception as error:
+            self.failed_batches += 1
+            self.failed_events += len(raw)
+            print(f"Lot ignoré ({len(raw)} événements) après erreur de traitement: {error}")
+        return len(raw)
+
+    def reconnect(self, error: Exception, attempt: int):
+        """
+        Ferme puis rouvre la source après une perte de connexion, avec un délai exponentiel.
+
+        La position du curseur est conservée par la source: aucun événement n'est perdu
+        ni compté deux fois. Un échec de réouverture est signalé à la lecture suivante.
+        """
+        delay = min(self.reconnect_delay * 2 ** (attempt - 1), 60.0)
+        print(f"Connexion perdue ({error}); reconnexion {attempt}/{self.max_reconnects} dans {delay:.0f} s")
+        self.source.close()
+        time.sleep(delay)
+        try:
+            self.source.open()
+            self.reconnects += 1
+        except getattr(self.source, "connection_errors", ()) as open_error:
+            print(f"Reconnexion échouée: {open_error}")
+
+    def run(self, max_batches: Optional[int] = None,
+            on_update: Optional[Callable[[IncrementalAnalytics], None]] = None):
+        """
+        Suit la source jusqu'à `max_batches` lots non vides (indéfiniment si None).
+
+        Un lot plein est suivi immédiatement du suivant pour rattraper le retard;
+        sinon la source attend (notification ou intervalle de polling).
+
+        Une perte de connexion rouvre la source (voir reconnect) et le suivi s'arrête
+        après `max_reconnects` échecs consécutifs; les autres erreurs de lecture sont
+        réessayées sur place. Dans les deux cas le curseur n'a pas avancé.
+        """
+        connection_errors = getattr(self.source, "connection_errors", ())
+        self.source.open()
+        batches = 0
+        failures = 0
+        try:
+            while max_batches is None or batches < max_batches:
+                try:
+                    count = self.process_batch()
+                except connection_errors as error:
+                    failures += 1
+                    if failures > self.max_reconnects:
+                        print(f"Connexion perdue {failures} fois de suite, arrêt du suivi.")
+                        raise
+                    self.reconnect(error, failures)
+                    continue
+                except Exception as error:
+                    print(f"Erreur de lecture de la source, nouvel essai: {error}")
+                    self.source.wait()
+                    continue
+                failures = 0
+                if count:
+                    batches += 1
+                    if on_update:
+                        on_update(self.analytics)
+                if self.source.exhausted and count == 0:
+                    break
+                if count < getattr(self.source, "batch_size", count + 1):
+                    self.source.wait()
+        except KeyboardInterrupt:
+            print("\nTail stopped.")
+        finally:
+            self.source.close()
+        return self.analytics
@@ -0,0 +1,204 @@
+import numpy as np
+import pandas as pd
+from typing import List, Optional, Tuple
+from Sessionizer_APP import Sessionizer
+
+
+class PathAnalyzer:
+    """Compte les parcours de k étapes et les entonnoirs sur la séquence d'événements nettoyée."""
+
+    def __init__(self, df: pd.DataFrame, session_gap_minutes: Optional[float] = 30,
+                 chunk_size: int = 5_000_000):
+        """
+        Initialise le PathAnalyzer.
+
+        Args:
+            df (pd.DataFrame): Données nettoyées (sortie de DataCleaner)
+            session_gap_minutes (Optional[float]): Écart d'inactivité coupant les sessions;
+                None pour considérer tout l'historique d'un utilisateur
+            chunk_size (int): Nombre de fenêtres traitées à la fois lors du comptage
+        """
+        self.sessionizer = Sessionizer(df, gap_minutes=session_gap_minutes)
+        self.chunk_size = chunk_size
+        self.categories = None
+        self.codes = None
+        self.groups = None
+        self.user_codes = None
+        self.timestamps = None
+
+    def load_data(self):
+        """Sessionise les événements et prépare les tableaux de codes entiers."""
+        self.sessionizer.sessionize()
+        self.categories = self.sessionizer.categories
+        self.codes = self.sessionizer.category_codes.astype(np.int64)
+        self.groups = self.sessionizer.session_ids
+        self.user_codes = self.sessionizer.user_codes
+        self.timestamps = self.sessionizer.timestamps
+
+    def _sequence(self, collapse_repeats: bool) -> Tuple[np.ndarray, np.ndarray]:
+        """Retourne (codes, groupes), sans les pages répétées consécutives si demandé."""
+        if not collapse_repeats or len(self.codes) < 2:
+            return self.codes, self.groups
+        keep = np.ones(len(self.codes), dtype=bool)
+        keep[1:] = (self.codes[1:] != self.codes[:-1]) | (self.groups[1:] != self.groups[:-1])
+        return self.codes[keep], self.groups[keep]
+
+    def _max_steps(self) -> int:
+        """Plus grand k dont les clés empaquetées tiennent dans un int64."""
+        base = max(len(self.categories), 2)
+        return int(np.floor(63 / np.log2(base)))
+
+    def _count_keys(self, codes: np.ndarray, groups: np.ndarray, k: int,
+                    allowed_prefixes: Optional[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Compte les clés empaquetées des fenêtres de k étapes, par blocs.
+
+        La mémoire reste bornée par `chunk_size` plus le nombre de parcours distincts,
+        quelle que soit la valeur de k.
+        """
+        base = len(self.categories)
+        n_windows = len(codes) - k + 1
+        keys_total = np.empty(0, dtype=np.int64)
+        counts_total = np.empty(0, dtype=np.int64)
+        if n_windows <= 0:
+            return keys_total, counts_total
+
+        for start in range(0, n_windows, self.chunk_size):
+            stop = min(start + self.chunk_size, n_windows)
+            # Une fenêtre est valide si sa première et sa dernière page sont dans le même groupe
+            valid = groups[start:stop] == groups[start + k - 1:stop + k - 1]
+            keys = np.zeros(stop - start, dtype=np.int64)
+            for step in range(k):
+                keys = keys * base + codes[start + step:stop + step]
+            keys = keys[valid]
+            if allowed_prefixes is not None:
+                keys = keys[np.isin(keys // base, allowed_prefixes)]
+
+            chunk_keys, chunk_counts = np.unique(keys, return_counts=True)
+            merged_keys, inverse = np.unique(np.concatenate([keys_total, chunk_keys]), return_inverse=True)
+            keys_total = merged_keys
+            counts_total = np.bincount(
+                inverse, weights=np.concatenate([counts_total, chunk_counts]), minlength=len(merged_keys)
+            ).astype(np.int64)
+
+        return keys_total, counts_total
+
+    def _frequent_keys(self, codes: np.ndarray, groups: np.ndarray, k: int,
+                       min_count: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Compte les parcours de k étapes en élaguant ceux dont le préfixe est trop rare."""
+        allowed_prefixes = None
+        if min_count > 1 and k > 1:
+            # Un parcours ne peut pas être plus fréquent que son préfixe de k-1 étapes
+            prefix_keys, _ = self._frequent_keys(codes, groups, k - 1, min_count)
+            allowed_prefixes = prefix_keys
+        keys, counts = self._count_keys(codes, groups, k, allowed_prefixes)
+        mask = counts >= min_count
+        return keys[mask], counts[mask]
+
+    def _unpack(self, keys: np.ndarray, k: int) -> List[np.ndarray]:
+        """Décompose les clés empaquetées en k colonnes de codes."""
+        base = len(self.categories)
+        columns = []
+        remaining = keys.copy()
+        for _ in range(k):
+            remaining, code = np.divmod(remaining, base)
+            columns.append(code)
+        return columns[::-1]
+
+    def count_paths(self, k: int = 3, min_count: int = 1, top: Optional[int] = None,
+                    collapse_repeats: bool = True) -> pd.DataFrame:
+        """
+        Compte les parcours de k étapes consécutives (n-grammes de catégories).
+
+        Args:
+            k (int): Nombre d'étapes du parcours
+            min_count (int): Occurrences minimales; active l'élagage par préfixe si > 1
+            top (Optional[int]): Ne garder que les `top` parcours les plus fréquents
+            collapse_repeats (bool): Fusionner les visites consécutives d'une même page
+
+        Returns:
+            pd.DataFrame: Colonnes step_1..step_k, path et count, triées par fréquence
+        """
+        if self.codes is None:
+            self.load_data()
+        if k < 1:
+            raise ValueError("k doit être supérieur ou égal à 1.")
+        if k > self._max_steps():
+            raise ValueError(f"k={k} trop grand pour {len(self.categories)} catégories (max {self._max_steps()}).")
+
+        codes, groups = self._sequence(collapse_repeats)
+        keys, counts = self._frequent_keys(codes, groups, k, min_count)
+
+        if top is not None and len(keys) > top:
+            selected = np.argpartition(-counts, top - 1)[:top]
+            keys, counts = keys[selected], counts[selected]
+
+        order = np.lexsort((keys, -counts))
+        keys, counts = keys[order], counts[order]
+
+        result = pd.DataFrame({
+            f"step_{i + 1}": self.categories.take(column)
+            for i, column in enumerate(self._unpack(keys, k))
+        })
+        step_columns = list(result.columns)
+        result["path"] = result[step_columns].agg(" → ".join, axis=1) if len(result) else pd.Series(dtype=str)
+        result["count"] = counts
+        return result
+
+    def funnel(self, steps: List[str], max_step_minutes: Optional[float] = None) -> pd.DataFrame:
+        """
+        Calcule la conversion d'un entonnoir ordonné de catégories.
+
+        Les étapes doivent se suivre dans l'ordre au sein d'une même session, sans être
+        forcément consécutives. Avec `max_step_minutes`, chaque étape doit être atteinte
+        au plus tard ce délai après l'étape précédente; pour chaque occurrence, on retient
+        la dernière occurrence valide de l'étape précédente, ce qui est optimal.
+
+        Args:
+            steps (List[str]): Catégories de l'entonnoir, dans l'ordre
+            max_step_minutes (Optional[float]): Délai maximal entre deux étapes
+
+        Returns:
+            pd.DataFrame: Par étape, nombre de sessions et d'utilisateurs convertis et taux
+        """
+        if self.codes is None:
+            self.load_data()
+        if not steps:
+            raise ValueError("L'entonnoir doit contenir au moins une étape.")
+
+        limit = pd.Timedelta(minutes=max_step_minutes).to_timedelta64() if max_step_minutes is not None else None
+        category_index = {category: code for code, category in enumerate(self.categories)}
+
+        rows = []
+        reached = np.empty(0, dtype=np.int64)
+        for position, step in enumerate(steps):
+            code = category_index.get(step)
+            candidates = np.flatnonzero(self.codes == code) if code is not None else np.empty(0, dtype=np.int64)
+
+            if position > 0:
+                # Dernière occurrence valide de l'étape précédente avant chaque candidat
+                previous = np.searchsorted(reached, candidates, side="left") - 1
+                ok = previous >= 0
+                previous = reached[np.where(ok, previous, 0)] if len(reached) else np.zeros_like(candidates)
+                ok &= self.groups[previous] == self.groups[candidates]
+                if limit is not None:
+                    ok &= (self.timestamps[candidates] - self.timestamps[previous]) <= limit
+                candidates = candidates[ok]
+
+            reached = candidates
+            sessions = np.unique(self.groups[reached])
+            users = np.unique(self.user_codes[reached])
+            rows.append({
+                "step": position + 1,
+                "category": step,
+                "sessions": len(sessions),
+                "users": len(users),
+            })
+
+        result = pd.DataFrame(rows)
+        first = result["sessions"].iloc[0]
+        result["conversion_from_previous"] = (
+            result["sessions"] / result["sessions"].shift(1).fillna(first).replace(0, np.nan)
+        ).fillna(0.0)
+        result["conversion_from_first"] = (result["sessions"] / first if first else 0.0)
+        return result
@@ -0,0 +1,49 @@
+import hashlib
+
+# Règle d'échantillonnage partagée par la requête SQL et par Sampling_APP (sans pandas,
+# pour que data_extractor_APP reste léger à importer).
+# Les utilisateurs sont répartis en SAMPLE_BUCKETS seaux selon le hachage de leur email;
+# un taux r garde les seaux < round(r * SAMPLE_BUCKETS). Même règle côté SQL et Python.
+# La résolution est donc de 1/SAMPLE_BUCKETS (0.01 %): un taux plus petit est refusé.
+SAMPLE_BUCKETS = 10000
+
+# Caractères retirés aux extrémités de l'email avant hachage, identiques des deux côtés:
+# trim() de PostgreSQL ne retire que les espaces et str.strip() tous les blancs.
+TRIMMED_CHARS = " \t\n\r"
+SQL_TRIMMED_CHARS = "E' \\t\\n\\r'"
+
+
+def sample_threshold(sample_rate: float) -> int:
+    """
+    Nombre de seaux conservés pour un taux d'échantillonnage donné.
+
+    Le taux est arrondi au 1/SAMPLE_BUCKETS le plus proche; un taux qui ne garderait
+    aucun seau (inférieur à 0.5/SAMPLE_BUCKETS) lève une ValueError.
+    """
+    if not 0 < sample_rate <= 1:
+        raise ValueError("sample_rate doit être compris dans ]0, 1].")
+    threshold = int(round(sample_rate * SAMPLE_BUCKETS))
+    if threshold == 0:
+        raise ValueError(
+            f"sample_rate={sample_rate} est inférieur à la résolution d'échantillonnage "
+            f"(1/{SAMPLE_BUCKETS}); aucun utilisateur ne serait conservé."
+        )
+    return threshold
+
+
+def sql_sample_clause(column: str) -> str:
+    """
+    Condition SQL (PostgreSQL) équivalente à user_bucket() < seuil.
+
+    Le seuil est passé en paramètre (%s) pour rester compatible avec psycopg2.
+    """
+    return (
+        f"mod(('x' || substr(md5(lower(btrim({column}, {SQL_TRIMMED_CHARS}))), 1, 8))::bit(32)::bigint, "
+        f"{SAMPLE_BUCKETS}) < %s"
+    )
+
+
+def user_bucket(user) -> int:
+    """Seau d'échantillonnage d'un utilisateur, calculé comme sql_sample_clause()."""
+    normalized = str(user).strip(TRIMMED_CHARS).lower()
+    return int(hashlib.md5(normalized.encode("utf-8")).hexdigest()[:8], 16) % SAMPLE_BUCKETS
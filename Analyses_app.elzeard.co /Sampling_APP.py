@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional, Tuple
+from SamplingRule_APP import SAMPLE_BUCKETS, sample_threshold, sql_sample_clause, user_bucket
+
+Z_95 = 1.96
+
+
+def user_buckets(users: pd.Series) -> np.ndarray:
+    """
+    Seau d'échantillonnage déterministe de chaque utilisateur.
+
+    Seuls les emails distincts sont hachés (voir SamplingRule_APP.user_bucket); les
+    valeurs manquantes reçoivent un seau jamais conservé.
+    """
+    codes, uniques = pd.factorize(users)
+    buckets = np.array([user_bucket(user) for user in uniques] + [SAMPLE_BUCKETS], dtype=np.int64)
+    return buckets[codes]
+
+
+def sample_users(df: pd.DataFrame, sample_rate: Optional[float],
+                 user_col: str = "person.properties.email") -> pd.DataFrame:
+    """
+    Garde l'historique complet d'une fraction déterministe des utilisateurs.
+
+    L'opération est idempotente: des données déjà échantillonnées au même taux
+    (par exemple côté SQL) sont conservées telles quelles.
+    """
+    if sample_rate is None or sample_rate >= 1 or df.empty:
+        return df
+    return df[user_buckets(df[user_col]) < sample_threshold(sample_rate)]
+
+
+def scale_factor(sample_rate: Optional[float]) -> float:
+    """Facteur d'extrapolation des comptes mesurés sur l'échantillon."""
+    return 1.0 if sample_rate is None or sample_rate >= 1 else SAMPLE_BUCKETS / sample_threshold(sample_rate)
+
+
+def headline_metrics(df: pd.DataFrame, sample_rate: Optional[float],
+                     user_col: str = "person.properties.email") -> Dict[str, Tuple[float, float, float]]:
+    """
+    Métriques principales extrapolées avec leur intervalle de confiance à 95 %.
+
+    Les utilisateurs étant tirés indépendamment (Bernoulli de taux r), un total Y
+    est estimé par Σy/r avec Var = (1 - r)/r² · Σy², et le ratio vues/utilisateur
+    par linéarisation. Sans échantillonnage, les intervalles sont de largeur nulle.
+
+    Returns:
+        Dict[str, Tuple[float, float, float]]: métrique -> (estimation, borne basse, borne haute)
+    """
+    rate = 1.0 / scale_factor(sample_rate)
+    views_per_user = df.groupby(user_col).size().to_numpy(dtype=np.float64)
+    n_users = len(views_per_user)
+    n_views = views_per_user.sum()
+
+    users_estimate = n_users / rate
+    users_se = np.sqrt(n_users * (1 - rate)) / rate
+    views_estimate = n_views / rate
+    views_se = np.sqrt((1 - rate) * np.sum(views_per_user ** 2)) / rate
+
+    ratio = n_views / n_users if n_users else 0.0
+    ratio_se = (
+        np.sqrt((1 - rate) * np.sum((views_per_user - ratio) ** 2)) / rate / users_estimate
+        if n_users else 0.0
+    )
+
+    def interval(estimate, se):
+        return float(estimate), float(max(estimate - Z_95 * se, 0.0)), float(estimate + Z_95 * se)
+
+    return {
+        "users": interval(users_estimate, users_se),
+        "views": interval(views_estimate, views_se),
+        "views_per_user": interval(ratio, ratio_se),
+    }
@@ -0,0 +1,144 @@
+import numpy as np
+import pandas as pd
+from collections import defaultdict
+from typing import Dict, Optional
+
+
+class Sessionizer:
+    """Découpe l'historique de navigation de chaque utilisateur en sessions."""
+
+    def __init__(self, df: pd.DataFrame, gap_minutes: Optional[float] = 30,
+                 user_col: str = "person.properties.email",
+                 category_col: str = "category",
+                 datetime_col: str = "datetime"):
+        """
+        Initialise le Sessionizer.
+
+        Args:
+            df (pd.DataFrame): Données nettoyées (sortie de DataCleaner)
+            gap_minutes (Optional[float]): Inactivité maximale entre deux événements d'une même
+                session; None pour une seule session par utilisateur
+            user_col (str): Colonne identifiant l'utilisateur
+            category_col (str): Colonne de la catégorie visitée
+            datetime_col (str): Colonne de l'horodatage de l'événement
+        """
+        self.df = df
+        self.gap = pd.Timedelta(minutes=gap_minutes) if gap_minutes is not None else None
+        self.user_col = user_col
+        self.category_col = category_col
+        self.datetime_col = datetime_col
+        self.events = None
+        self.sessions = None
+        self.users = None
+        self.categories = None
+        self.user_codes = None
+        self.category_codes = None
+        self.session_ids = None
+        self.timestamps = None
+
+    def sessionize(self) -> pd.DataFrame:
+        """
+        Attribue un identifiant de session à chaque événement.
+
+        Une nouvelle session commence au premier événement d'un utilisateur ou
+        après une inactivité supérieure à `gap`. Le calcul est entièrement
+        vectorisé sur des codes entiers (comparaison décalée + somme cumulée),
+        sans boucle Python.
+
+        Returns:
+            pd.DataFrame: Événements triés avec une colonne `session_id`
+        """
+        timestamps = self.df[self.datetime_col]
+        if not pd.api.types.is_datetime64_any_dtype(timestamps):
+            timestamps = pd.to_datetime(timestamps, errors="coerce")
+        timestamps = timestamps.to_numpy(dtype="datetime64[ns]")
+
+        # Les chaînes ne sont factorisées qu'une fois; tout le reste travaille sur des entiers
+        user_codes, users = pd.factorize(self.df[self.user_col])
+        category_codes, categories = pd.factorize(self.df[self.category_col].astype(str))
+
+        # Les événements sans horodatage ne peuvent pas être placés dans une session
+        valid = ~np.isnat(timestamps)
+        if not valid.all():
+            print(f"Événements ignorés sans datetime valide: {int((~valid).sum())}")
+            timestamps = timestamps[valid]
+            user_codes = user_codes[valid]
+            category_codes = category_codes[valid]
+
+        order = np.lexsort((timestamps, user_codes))
+        timestamps = timestamps[order]
+        user_codes = user_codes[order]
+        category_codes = category_codes[order]
+
+        new_session = np.ones(len(order), dtype=bool)
+        if len(order) > 1:
+            new_session[1:] = user_codes[1:] != user_codes[:-1]
+            if self.gap is not None:
+                new_session[1:] |= (timestamps[1:] - timestamps[:-1]) > self.gap.to_timedelta64()
+
+        self.users = users
+        self.categories = categories
+        self.user_codes = user_codes
+        self.category_codes = category_codes
+        self.session_ids = np.cumsum(new_session) - 1
+        self.timestamps = timestamps
+
+        self.events = pd.DataFrame({
+            self.user_col: pd.Categorical.from_codes(user_codes, users),
+            self.category_col: pd.Categorical.from_codes(category_codes, categories),
+            self.datetime_col: timestamps,
+            "session_id": self.session_ids,
+        })
+        self.sessions = self._summarize(new_session, timestamps)
+        return self.events
+
+    def _summarize(self, new_session: np.ndarray, timestamps: np.ndarray) -> pd.DataFrame:
+        """Calcule durée, profondeur et pages d'entrée/sortie de chaque session."""
+        starts = np.flatnonzero(new_session)
+        ends = np.append(starts[1:], len(new_session))[:len(starts)] - 1
+
+        return pd.DataFrame({
+            "session_id": np.arange(len(starts)),
+            self.user_col: pd.Categorical.from_codes(self.user_codes[starts], self.users),
+            "start": timestamps[starts],
+            "end": timestamps[ends],
+            "duration": timestamps[ends] - timestamps[starts],
+            "depth": ends - starts + 1,
+            "entry_page": pd.Categorical.from_codes(self.category_codes[starts], self.categories),
+            "exit_page": pd.Categorical.from_codes(self.category_codes[ends], self.categories),
+        })
+
+    def transition_counts(self, within_sessions: bool = True) -> Dict[str, Dict[str, int]]:
+        """
+        Compte les transitions entre catégories consécutives différentes.
+
+        Args:
+            within_sessions (bool): Si True, ignore les transitions entre deux sessions
+                d'un même utilisateur; sinon seules les frontières d'utilisateur coupent
+
+        Returns:
+            Dict[str, Dict[str, int]]: transitions[source][target] = nombre
+        """
+        if self.events is None:
+            self.sessionize()
+
+        transitions = defaultdict(lambda: defaultdict(int))
+        if len(self.category_codes) < 2:
+            return transitions
+
+        codes = self.category_codes
+        uniques = self.categories
+        groups = self.session_ids if within_sessions else self.user_codes
+
+        source = codes[:-1]
+        target = codes[1:]
+        mask = (groups[1:] == groups[:-1]) & (source != target)
+
+        # Clé entière unique par couple (source, target) puis comptage
+        keys = source[mask].astype(np.int64) * len(uniques) + target[mask]
+        pair_keys, counts = np.unique(keys, return_counts=True)
+        for key, count in zip(pair_keys, counts):
+            src, tgt = divmod(int(key), len(uniques))
+            transitions[uniques[src]][uniques[tgt]] = int(count)
+
+        return transitions
@@ -0,0 +1,176 @@
+import numpy as np
+import pandas as pd
+from collections import defaultdict
+from typing import Dict, Optional, Tuple
+from Sessionizer_APP import Sessionizer
+
+
+class TransitionTensor:
+    """Tenseur de transitions découpé par période (période × source × cible)."""
+
+    def __init__(self, df: pd.DataFrame, freq: str = "W",
+                 session_gap_minutes: Optional[float] = None):
+        """
+        Initialise le TransitionTensor.
+
+        Args:
+            df (pd.DataFrame): Données nettoyées (sortie de DataCleaner)
+            freq (str): Fréquence des périodes ('D', 'W', 'M', ...)
+            session_gap_minutes (Optional[float]): Si défini, ne compte que les transitions
+                à l'intérieur d'une session (voir Sessionizer)
+        """
+        self.sessionizer = Sessionizer(df, gap_minutes=session_gap_minutes)
+        self.freq = freq
+        self.categories = None
+        self.periods = None
+        self.transitions = None
+        self.visits = None
+        self.unique_users = None
+        self._cum_transitions = None
+        self._cum_visits = None
+
+    def build(self) -> np.ndarray:
+        """
+        Construit en une passe les comptes par période.
+
+        Une transition est rattachée à la période de sa page cible. En plus du tenseur
+        `transitions` (période × source × cible), calcule `visits` (pages vues par période
+        et catégorie) et `unique_users` (utilisateurs distincts par période et catégorie,
+        non additifs d'une période à l'autre).
+
+        Returns:
+            np.ndarray: Tenseur des transitions
+        """
+        sessionizer = self.sessionizer
+        sessionizer.sessionize()
+        self.categories = sessionizer.categories
+        codes = sessionizer.category_codes.astype(np.int64)
+        n_categories = len(self.categories)
+
+        if len(codes) == 0:
+            self.periods = pd.PeriodIndex([], freq=self.freq)
+            self.transitions = np.zeros((0, n_categories, n_categories), dtype=np.int64)
+            self.visits = np.zeros((0, n_categories), dtype=np.int64)
+            self.unique_users = np.zeros((0, n_categories), dtype=np.int64)
+            self._build_cumulative()
+            return self.transitions
+
+        ordinals = pd.DatetimeIndex(sessionizer.timestamps).to_period(self.freq).asi8
+        first, last = ordinals.min(), ordinals.max()
+        buckets = ordinals - first
+        n_buckets = int(last - first) + 1
+        self.periods = pd.period_range(
+            start=pd.Period(ordinal=first, freq=self.freq), periods=n_buckets, freq=self.freq
+        )
+
+        cells = buckets * n_categories + codes
+        self.visits = np.bincount(cells, minlength=n_buckets * n_categories).reshape(n_buckets, n_categories)
+
+        # Couples (cellule, utilisateur) distincts; +1 pour les emails manquants codés -1
+        n_users = len(sessionizer.users) + 1
+        user_cells = np.unique(cells * n_users + sessionizer.user_codes + 1)
+        self.unique_users = np.bincount(
+            user_cells // n_users, minlength=n_buckets * n_categories
+        ).reshape(n_buckets, n_categories)
+
+        groups = sessionizer.session_ids
+        mask = (groups[1:] == groups[:-1]) & (codes[1:] != codes[:-1])
+        keys = (buckets[1:][mask] * n_categories + codes[:-1][mask]) * n_categories + codes[1:][mask]
+        self.transitions = np.bincount(
+            keys, minlength=n_buckets * n_categories * n_categories
+        ).reshape(n_buckets, n_categories, n_categories)
+
+        self._build_cumulative()
+        return self.transitions
+
+    def _build_cumulative(self):
+        """Sommes cumulées préfixées d'un zéro pour des requêtes de plage en O(1)."""
+        self._cum_transitions = np.concatenate(
+            [np.zeros((1,) + self.transitions.shape[1:], dtype=np.int64), np.cumsum(self.transitions, axis=0)]
+        )
+        self._cum_visits = np.concatenate(
+            [np.zeros((1,) + self.visits.shape[1:], dtype=np.int64), np.cumsum(self.visits, axis=0)]
+        )
+
+    def _bucket_range(self, start=None, end=None) -> Tuple[int, int]:
+        """Convertit des dates (incluses) en indices [début, fin) de périodes."""
+        if self.transitions is None:
+            self.build()
+        n_buckets = len(self.periods)
+        if n_buckets == 0:
+            return 0, 0
+        origin = self.periods[0].ordinal
+        first, stop = 0, n_buckets
+        if start is not None:
+            first = min(max(pd.Period(start, freq=self.freq).ordinal - origin, 0), n_buckets)
+        if end is not None:
+            stop = min(max(pd.Period(end, freq=self.freq).ordinal - origin + 1, 0), n_buckets)
+        return first, max(first, stop)
+
+    def complete_periods(self) -> pd.PeriodIndex:
+        """
+        Périodes entièrement couvertes par les données, au jour près.
+
+        La première et la dernière période sont en général partielles (données commencées
+        ou arrêtées en cours de semaine): elles sont exclues si le premier (dernier) jour
+        de données est après le début (avant la fin) de la période.
+        """
+        if self.transitions is None:
+            self.build()
+        if len(self.periods) == 0:
+            return self.periods
+        timestamps = pd.DatetimeIndex(self.sessionizer.timestamps)
+        first_day, last_day = timestamps.min().normalize(), timestamps.max().normalize()
+        complete = (self.periods.start_time >= first_day) & (self.periods.end_time.normalize() <= last_day)
+        return self.periods[complete]
+
+    def slice(self, start=None, end=None) -> np.ndarray:
+        """Sous-tenseur des périodes comprises entre start et end (inclus)."""
+        first, stop = self._bucket_range(start, end)
+        return self.transitions[first:stop]
+
+    def range_matrix(self, start=None, end=None) -> np.ndarray:
+        """Matrice source × cible agrégée sur une plage de dates, en O(1) via les cumuls."""
+        first, stop = self._bucket_range(start, end)
+        return self._cum_transitions[stop] - self._cum_transitions[first]
+
+    def range_visits(self, start=None, end=None) -> np.ndarray:
+        """Pages vues par catégorie sur une plage de dates, en O(1) via les cumuls."""
+        first, stop = self._bucket_range(start, end)
+        return self._cum_visits[stop] - self._cum_visits[first]
+
+    def diff(self, period_a: Tuple, period_b: Tuple) -> np.ndarray:
+        """
+        Différence des transitions entre deux plages (B - A).
+
+        Args:
+            period_a (Tuple): (start, end) de la période de référence
+            period_b (Tuple): (start, end) de la période comparée
+
+        Returns:
+            np.ndarray: Matrice source × cible des variations
+        """
+        return self.range_matrix(*period_b) - self.range_matrix(*period_a)
+
+    def to_transitions(self, matrix: np.ndarray) -> Dict[str, Dict[str, int]]:
+        """Convertit une matrice au format de ChordDiagramAnalyzer.transitions."""
+        transitions = defaultdict(lambda: defaultdict(int))
+        for source, target in zip(*np.nonzero(matrix)):
+            transitions[self.categories[source]][self.categories[target]] = int(matrix[source, target])
+        return transitions
+
+    def top_changes(self, period_a: Tuple, period_b: Tuple, top: int = 10) -> pd.DataFrame:
+        """Transitions dont le nombre varie le plus entre deux plages."""
+        before = self.range_matrix(*period_a)
+        after = self.range_matrix(*period_b)
+        delta = after - before
+        sources, targets = np.nonzero(delta)
+        order = np.argsort(-np.abs(delta[sources, targets]), kind="mergesort")[:top]
+        sources, targets = sources[order], targets[order]
+        return pd.DataFrame({
+            "source": self.categories.take(sources),
+            "target": self.categories.take(targets),
+            "before": before[sources, targets],
+            "after": after[sources, targets],
+            "change": delta[sources, targets],
+        })
@@ -0,0 +1,266 @@
+"""Command line entry point for the navigation analysis pipeline.
+
+Heavy modules (psycopg2, pandas, plotly, ...) are only imported by the
+subcommands that need them, so that small scheduled runs start quickly:
+
+    python cli.py extract --start-date 2025-01-01 --end-date 2025-01-16
+    python cli.py clean
+    python cli.py chord --session-gap 30
+    python cli.py all --sample-rate 0.01
+    python cli.py tail --poll-interval 2
+"""
+import argparse
+import importlib
+import os
+import sys
+import time
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_INPUT = os.path.join(CURRENT_DIR, "input.csv")
+DEFAULT_OUTPUT_DIR = os.path.join(CURRENT_DIR, "output")
+DEFAULT_CLEANED = os.path.join(DEFAULT_OUTPUT_DIR, "app.elzeard.co.csv")
+DEFAULT_DB_CONFIG = os.path.join(CURRENT_DIR, "config", "database.json")
+DEFAULT_QUERIES_CONFIG = os.path.join(CURRENT_DIR, "config", "queries.json")
+
+IMPORT_TIMES = {}
+
+
+def _import(module_name):
+    """Import a module on demand and record how long it took"""
+    start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    IMPORT_TIMES.setdefault(module_name, time.perf_counter() - start)
+    return module
+
+
+def _report_import_times():
+    total = sum(IMPORT_TIMES.values())
+    details = ", ".join(f"{name} {elapsed:.2f}s" for name, elapsed in IMPORT_TIMES.items())
+    print(f"\nImport time: {total:.2f}s ({details})" if details else "\nImport time: 0.00s")
+
+
+def run_extract(args):
+    extractor_module = _import("data_extractor_APP")
+    extractor = extractor_module.DataExtractor(
+        db_config_path=args.db_config,
+        queries_config_path=args.queries_config
+    )
+    print("Starting data extraction...")
+    return extractor.extract_data(
+        args.query,
+        args.input,
+        sample_rate=args.sample_rate,
+        start_date=args.start_date,
+        end_date=args.end_date
+    )
+
+
+def run_clean(args):
+    if not os.path.exists(args.input):
+        print(f"Input file not found: {args.input}")
+        return False
+
+    cleaner_module = _import("DataCleaner_APP")
+    print("\nStarting data cleaning...")
+    cleaner = cleaner_module.DataCleaner(args.input, sample_rate=args.sample_rate)
+    cleaned_df = cleaner.clean_data()
+    if cleaned_df.empty:
+        print("Cleaning resulted in empty DataFrame. Stopping process.")
+        return False
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.cleaned)), exist_ok=True)
+    cleaned_df.to_csv(args.cleaned, index=False)
+    print(f"Cleaned data saved to: {args.cleaned}")
+    return True
+
+
+def _output_figure(fig, name, args, figures, title):
+    """Export a figure headlessly, or write it and open it in a browser with --show"""
+    figures[title] = fig
+    os.makedirs(args.output_dir, exist_ok=True)
+    if args.show:
+        pio = _import("plotly.io")
+        pio.renderers.default = "browser"
+        output = os.path.join(args.output_dir, f"{name}.html")
+        fig.write_html(output)
+        fig.show()
+    else:
+        export_module = _import("FigureExport_APP")
+        exporter = export_module.FigureExporter(args.output_dir, export_format=args.format, compress=args.gzip)
+        output = exporter.export(fig, name)
+    print(f"{title} saved to: {output}")
+    return output
+
+
+def run_chord(args, figures=None):
+    if not os.path.exists(args.cleaned):
+        print(f"Cleaned file not found: {args.cleaned}")
+        return False
+
+    chord_module = _import("Diagramme_CHORDS_APP")
+    print("\nGenerating chord diagram...")
+    analyzer = chord_module.ChordDiagramAnalyzer(args.cleaned, sample_rate=args.sample_rate)
+    analyzer.load_data()
+    analyzer.analyze_transitions(session_gap_minutes=args.session_gap)
+    fig = analyzer.create_chord_diagram(min_value=args.min_value)
+    _output_figure(fig, "chord_diagram", args, figures if figures is not None else {}, "Chord diagram")
+    return True
+
+
+def run_treemap(args, figures=None):
+    if not os.path.exists(args.cleaned):
+        print(f"Cleaned file not found: {args.cleaned}")
+        return False
+
+    treemap_module = _import("Diagramme_TREEMAP_APP")
+    print("\nGenerating temporal flow diagram...")
+    flow = treemap_module.TemporalFlow(args.cleaned, sample_rate=args.sample_rate)
+    flow.load_data()
+    fig = flow.create_user_journey()
+    _output_figure(fig, "temporal_flow", args, figures if figures is not None else {}, "Temporal flow diagram")
+    return True
+
+
+def run_all(args):
+    if not run_extract(args):
+        print("Data extraction failed. Stopping process.")
+        return False
+    if not run_clean(args):
+        return False
+
+    figures = {}
+    ok = True
+    for step in (run_treemap, run_chord):
+        try:
+            ok = step(args, figures) and ok
+        except Exception as e:
+            print(f"Error in {step.__name__}: {e}")
+            ok = False
+
+    if figures and not args.show:
+        export_module = _import("FigureExport_APP")
+        exporter = export_module.FigureExporter(args.output_dir, export_format=args.format, compress=args.gzip)
+        print(f"\nCombined report saved to: {exporter.write_report(figures)}")
+    return ok
+
+
+def run_tail(args):
+    extractor_module = _import("data_extractor_APP")
+    tail_module = _import("LiveTail_APP")
+    chord_module = _import("Diagramme_CHORDS_APP")
+    export_module = _import("FigureExport_APP")
+
+    extractor = extractor_module.DataExtractor(
+        db_config_path=args.db_config,
+        queries_config_path=args.queries_config
+    )
+    source = tail_module.PostgresEventSource(
+        extractor,
+        query_name=args.query,
+        start=args.start_date,
+        batch_size=args.batch_size,
+        poll_interval=args.poll_interval
+    )
+    tail = tail_module.LiveTail(
+        source,
+        cleaner=_import("DataCleaner_APP").DataCleaner(sample_rate=args.sample_rate, verbose=False),
+        analytics=tail_module.IncrementalAnalytics(
+            session_gap_minutes=args.session_gap,
+            sample_rate=args.sample_rate
+        ),
+        max_reconnects=args.max_reconnects
+    )
+    exporter = export_module.FigureExporter(args.output_dir, export_format=args.format, compress=args.gzip)
+    os.makedirs(args.output_dir, exist_ok=True)
+    last_export = [0.0]
+
+    def on_update(analytics):
+        print(f"{analytics.last_update:%H:%M:%S} - {analytics.events_processed} events, "
+              f"{len(analytics.last_seen)} users, {len(analytics.categories)} categories")
+        if time.monotonic() - last_export[0] < args.export_interval:
+            return
+        analyzer = chord_module.ChordDiagramAnalyzer("live")
+        analytics.apply_to(analyzer)
+        fig = analyzer.create_chord_diagram(min_value=args.min_value)
+        exporter.export(fig, "chord_diagram_live")
+        tail_module.write_live_state(args.output_dir, analytics, fig)
+        last_export[0] = time.monotonic()
+
+    print("Starting live tail...")
+    tail.run(max_batches=args.max_batches, on_update=on_update)
+    return True
+
+
+def build_parser():
+    sampling = argparse.ArgumentParser(add_help=False)
+    sampling.add_argument("--sample-rate", type=float, default=None,
+                          help="Keep whole histories for this fraction of users (e.g. 0.01)")
+
+    database = argparse.ArgumentParser(add_help=False)
+    database.add_argument("--db-config", default=DEFAULT_DB_CONFIG, help="Database configuration JSON")
+    database.add_argument("--queries-config", default=DEFAULT_QUERIES_CONFIG, help="Queries configuration JSON")
+
+    # Each parent's actions are shared by every subparser built from it: never
+    # change their defaults per subcommand, give the subcommand its own argument
+    extract = argparse.ArgumentParser(add_help=False)
+    extract.add_argument("--query", default="user_navigation", help="Query name in the queries configuration")
+    extract.add_argument("--start-date", default=None, help="YYYY-MM-DD, overrides the configured date range")
+    extract.add_argument("--end-date", default=None, help="YYYY-MM-DD, overrides the configured date range")
+
+    raw_input = argparse.ArgumentParser(add_help=False)
+    raw_input.add_argument("--input", default=DEFAULT_INPUT, help="Raw extracted CSV")
+
+    cleaned = argparse.ArgumentParser(add_help=False)
+    cleaned.add_argument("--cleaned", default=DEFAULT_CLEANED, help="Cleaned CSV")
+
+    figures = argparse.ArgumentParser(add_help=False)
+    figures.add_argument("--output-dir", default=DEFAULT_OUTPUT_DIR, help="Directory for exported figures")
+    figures.add_argument("--format", choices=("html", "json"), default="html", help="Headless export format")
+    figures.add_argument("--gzip", action="store_true", help="Gzip exported figures")
+    figures.add_argument("--show", action="store_true", help="Write standalone HTML and open it in a browser")
+    figures.add_argument("--min-value", type=int, default=1, help="Minimum transitions for a chord link")
+    figures.add_argument("--session-gap", type=float, default=None,
+                         help="Count chord transitions within sessions split by this inactivity (minutes)")
+
+    parser = argparse.ArgumentParser(description="Navigation analysis pipeline for app.elzeard.co")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("extract", parents=[sampling, database, extract, raw_input],
+                          help="Extract raw events from PostgreSQL").set_defaults(func=run_extract)
+    subparsers.add_parser("clean", parents=[sampling, raw_input, cleaned],
+                          help="Clean the raw CSV").set_defaults(func=run_clean)
+    subparsers.add_parser("chord", parents=[sampling, cleaned, figures],
+                          help="Build the chord diagram").set_defaults(func=run_chord)
+    subparsers.add_parser("treemap", parents=[sampling, cleaned, figures],
+                          help="Build the temporal flow treemap").set_defaults(func=run_treemap)
+    subparsers.add_parser("all", parents=[sampling, database, extract, raw_input, cleaned, figures],
+                          help="Run every step").set_defaults(func=run_all)
+
+    tail = subparsers.add_parser("tail", parents=[sampling, database, figures],
+                                 help="Follow new events and update the live chord diagram and dashboard view")
+    tail.set_defaults(func=run_tail)
+    tail.add_argument("--query", default="user_navigation_tail",
+                      help="Keyset query name, parameterised by (timestamp, uuid, limit)")
+    tail.add_argument("--start-date", default=None, help="YYYY-MM-DD cursor start (default: now)")
+    tail.add_argument("--batch-size", type=int, default=5000, help="Maximum events per micro-batch")
+    tail.add_argument("--poll-interval", type=float, default=2.0, help="Seconds between polls when idle")
+    tail.add_argument("--export-interval", type=float, default=10.0,
+                      help="Minimum seconds between two exports of the live chord diagram")
+    tail.add_argument("--max-batches", type=int, default=None, help="Stop after this many non-empty batches")
+    tail.add_argument("--max-reconnects", type=int, default=5,
+                      help="Give up after this many consecutive lost connections")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        ok = args.func(args)
+    except Exception as e:
+        print(f"An error occurred during execution: {e}")
+        ok = False
+    _report_import_times()
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,39 @@
 import streamlit as st
 import pandas as pd
+import plotly.io as pio
 from datetime import datetime, timedelta
+import json
 import os
 from DataCleaner_APP import DataCleaner            
 from Diagramme_CHORDS_APP import ChordDiagramAnalyzer  
+from TransitionTensor_APP import TransitionTensor
+from Sampling_APP import headline_metrics, scale_factor
+from DistinctCounter_APP import DistinctUserCounter
+
+LIVE_REFRESH_SECONDS = 10
+LIVE_STATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "output", "live_state.json")
+
+@st.fragment(run_every=LIVE_REFRESH_SECONDS)
+def live_view():
+    """Vue en direct: relit l'état écrit par `python cli.py tail` sans relancer le reste du dashboard"""
+    st.subheader("Vue en direct")
+    if not os.path.exists(LIVE_STATE_PATH):
+        st.info("Aucun suivi en cours: lancer `python cli.py tail` pour alimenter cette vue.")
+        return
+
+    # Lectura del estado escrito atómicamente por el tail
+    with open(LIVE_STATE_PATH, encoding="utf-8") as file:
+        state = json.load(file)
+
+    updated_at = datetime.fromisoformat(state["updated_at"]) if state["updated_at"] else None
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Événements traités", state["events_processed"])
+    col2.metric("Utilisateurs" + (" (estimé)" if state["sample_rate"] else ""), state["users"])
+    col3.metric("Catégories", state["categories"])
+    if updated_at:
+        age = (datetime.now() - updated_at).total_seconds()
+        st.caption(f"Mis à jour à {updated_at:%H:%M:%S} (il y a {age:.0f} s), actualisation toutes les {LIVE_REFRESH_SECONDS} s")
+    st.plotly_chart(pio.from_json(json.dumps(state["figure"])), use_container_width=True)
 
 def main():
     # Configuración de la página
@@ -46,7 +76,27 @@ def main():
             max_value=10,
             value=1
         )
+
+        sample_percent = st.slider(
+            "Échantillon d'utilisateurs (%)",
+            min_value=1,
+            max_value=100,
+            value=100
+        )
+        sample_rate = sample_percent / 100 if sample_percent < 100 else None
+
+        session_gap = st.number_input(
+            "Inactivité max. entre deux pages d'une session (minutes, 0 = désactivé)",
+            min_value=0,
+            value=0
+        )
+
+        show_live = st.toggle("Vue en direct (cli.py tail)", value=os.path.exists(LIVE_STATE_PATH))
     
+    if show_live:
+        live_view()
+        st.markdown("---")
+
     # Contenedor principal
     main_container = st.container()
     
@@ -62,7 +112,7 @@ def main():
                 
                 # Limpiar datos
                 with st.spinner("Nettoyage des données en cours..."):
-                    cleaner = DataCleaner(input_file)
+                    cleaner = DataCleaner(input_file, sample_rate=sample_rate)
                     df_clean = cleaner.clean_data()
                     
                     # Guardar datos limpios
@@ -70,9 +120,9 @@ def main():
                     
                 # Crear y mostrar diagrama
                 with st.spinner("Création du diagramme..."):
-                    chord_analyzer = ChordDiagramAnalyzer(output_file)
+                    chord_analyzer = ChordDiagramAnalyzer(output_file, sample_rate=sample_rate)
                     chord_analyzer.load_data()
-                    chord_analyzer.analyze_transitions()
+                    chord_analyzer.analyze_transitions(session_gap_minutes=session_gap or None)
                     fig = chord_analyzer.create_chord_diagram(min_value=min_value)
                     
                     st.plotly_chart(fig, use_container_width=True)
@@ -88,14 +138,27 @@ def main():
                 # Asegurarse de que las columnas existan
                 email_col = "person.properties.email" if "person.properties.email" in df_clean.columns else None
                 
-                if email_col:
-                    total_users = df_clean[email_col].nunique()
+                if email_col and sample_rate is None:
+                    total_users = DistinctUserCounter(df_clean, user_col=email_col).count()
                     total_views = len(df_clean)
                     avg_views_per_user = total_views / total_users if total_users > 0 else 0
                     
                     st.metric("Utilisateurs uniques", total_users)
                     st.metric("Vues totales", total_views)
                     st.metric("Vues moyennes par utilisateur", f"{avg_views_per_user:.2f}")
+                elif email_col:
+                    # Estimaciones extrapoladas desde la muestra, con IC 95 %
+                    metrics = headline_metrics(df_clean, sample_rate, user_col=email_col)
+                    users, users_low, users_high = metrics["users"]
+                    views, views_low, views_high = metrics["views"]
+                    ratio, ratio_low, ratio_high = metrics["views_per_user"]
+
+                    st.metric("Utilisateurs uniques (estimé)", f"{users:.0f}")
+                    st.caption(f"IC 95 %: {users_low:.0f} – {users_high:.0f}")
+                    st.metric("Vues totales (estimé)", f"{views:.0f}")
+                    st.caption(f"IC 95 %: {views_low:.0f} – {views_high:.0f}")
+                    st.metric("Vues moyennes par utilisateur", f"{ratio:.2f}")
+                    st.caption(f"IC 95 %: {ratio_low:.2f} – {ratio_high:.2f}")
                 
                 # Top categorías
                 if "category" in df_clean.columns:
@@ -103,5 +166,29 @@ def main():
                     top_categories = df_clean["category"].value_counts().head(10)
                     st.bar_chart(top_categories)
 
+                # Evolución semana a semana, con la misma sesión y escala que el diagrama
+                if email_col and "category" in df_clean.columns and "datetime" in df_clean.columns:
+                    tensor = TransitionTensor(df_clean, freq="W", session_gap_minutes=session_gap or None)
+                    tensor.build()
+                    # Solo semanas completas: la semana en curso haría bajar casi todas las transiciones
+                    complete_weeks = tensor.complete_periods()
+                    if len(complete_weeks) >= 2:
+                        previous, current = complete_weeks[-2], complete_weeks[-1]
+                        changes = tensor.top_changes(
+                            (previous.start_time, previous.end_time),
+                            (current.start_time, current.end_time)
+                        )
+                        scale = scale_factor(sample_rate)
+                        if scale != 1:
+                            changes["before"] = (changes["before"] * scale).round().astype(int)
+                            changes["after"] = (changes["after"] * scale).round().astype(int)
+                            changes["change"] = changes["after"] - changes["before"]
+                        st.subheader("Évolution des transitions (semaine)")
+                        st.caption(
+                            f"Semaine du {current.start_time:%d/%m} au {current.end_time:%d/%m} "
+                            f"comparée à la précédente (semaines complètes uniquement)"
+                        )
+                        st.dataframe(changes)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -3,6 +3,7 @@ import json
 import csv
 from datetime import datetime
 from tabulate import tabulate
+from SamplingRule_APP import sample_threshold, sql_sample_clause
 
 class DataExtractor:
     def __init__(self, db_config_path='Analyses_app.elzeard.co /config/database.json', queries_config_path='Analyses_app.elzeard.co /config/queries.json'):
@@ -23,6 +24,20 @@ class DataExtractor:
         """Convert date string from config to datetime object"""
         return datetime.strptime(date_str, '%Y-%m-%d')
 
+    def _build_query(self, query_config, sample_rate=None, start_date=None, end_date=None):
+        """Return the query and its parameters, sampling users in SQL if requested"""
+        start_date = self._parse_date(start_date or query_config['date_range']['start_date'])
+        end_date = self._parse_date(end_date or query_config['date_range']['end_date'])
+        query = query_config['query']
+        params = [start_date, end_date]
+
+        if sample_rate is not None and sample_rate < 1:
+            column = query_config.get('sample_column', 'email')
+            query = f"SELECT * FROM ({query}) AS sampled WHERE {sql_sample_clause('sampled.' + column)}"
+            params.append(sample_threshold(sample_rate))
+
+        return query, tuple(params)
+
     def connect(self):
         try:
             if not self.db_config:
@@ -42,7 +57,7 @@ class DataExtractor:
             print(f"Error connecting to PostgreSQL database: {error}")
             return False
 
-    def extract_data(self, query_name, output_path):
+    def extract_data(self, query_name, output_path, sample_rate=None, start_date=None, end_date=None):
         try:
             if not self.connection:
                 if not self.connect():
@@ -57,12 +72,14 @@ class DataExtractor:
                 print(f"Query configuration not found for: {query_name}")
                 return False
 
-            start_date = self._parse_date(query_config['date_range']['start_date'])
-            end_date = self._parse_date(query_config['date_range']['end_date'])
+            query, params = self._build_query(query_config, sample_rate, start_date, end_date)
+            start_date, end_date = params[0], params[1]
 
             print(f"Extracting data from {start_date} to {end_date}")
+            if sample_rate is not None and sample_rate < 1:
+                print(f"Sampling {sample_rate:.2%} of users")
             if self.cursor:
-                self.cursor.execute(query_config['query'], (start_date, end_date))
+                self.cursor.execute(query, params)
                 results = self.cursor.fetchall()
             else:
                 print("Cursor is not initialized.")
@@ -1,20 +1,30 @@
+import argparse
 import os
+import sys
 from data_extractor_APP import DataExtractor
 from Diagramme_CHORDS_APP import ChordDiagramAnalyzer
 from Diagramme_TREEMAP_APP import TemporalFlow
 from DataCleaner_APP import DataCleaner
+from FigureExport_APP import FigureExporter
 
-def main():
+def main(sample_rate=None, headless=False, export_format='html', compress=False):
     try:
         current_dir = os.path.dirname(os.path.abspath(__file__))
         input_file = os.path.join(current_dir, "input.csv")
         output_dir = os.path.join(current_dir, "output")
         os.makedirs(output_dir, exist_ok=True)
+        figures = {}
+
+        if headless:
+            exporter = FigureExporter(output_dir, export_format=export_format, compress=compress)
+        else:
+            import plotly.io as pio
+            pio.renderers.default = "browser"
 
         # Step 1: Extract data from database
         print("Starting data extraction...")
         extractor = DataExtractor()
-        if not extractor.extract_data('user_navigation', input_file):
+        if not extractor.extract_data('user_navigation', input_file, sample_rate=sample_rate):
             print("Data extraction failed. Stopping process.")
             return
         
@@ -24,7 +34,7 @@ def main():
 
         # Step 2: Clean data
         print("\nStarting data cleaning...")
-        cleaner = DataCleaner(input_file)
+        cleaner = DataCleaner(input_file, sample_rate=sample_rate)
         cleaned_df = cleaner.clean_data()
         if cleaned_df.empty:
             print("Cleaning resulted in empty DataFrame. Stopping process.")
@@ -37,12 +47,16 @@ def main():
         # Step 3: Generate temporal flow diagram
         print("\nGenerating temporal flow diagram...")
         try:
-            flow = TemporalFlow(cleaned_file)
+            flow = TemporalFlow(cleaned_file, sample_rate=sample_rate)
             flow.load_data()
             flow_fig = flow.create_user_journey()
-            flow_output = os.path.join(output_dir, "temporal_flow.html")
-            flow_fig.write_html(flow_output)
-            flow_fig.show()
+            figures["Parcours utilisateur"] = flow_fig
+            if headless:
+                flow_output = exporter.export(flow_fig, "temporal_flow")
+            else:
+                flow_output = os.path.join(output_dir, "temporal_flow.html")
+                flow_fig.write_html(flow_output)
+                flow_fig.show()
             print(f"Temporal flow diagram saved to: {flow_output}")
         except Exception as e:
             print(f"Error generating temporal flow diagram: {e}")
@@ -50,21 +64,47 @@ def main():
         # Step 4: Generate chord diagram
         print("\nGenerating chord diagram...")
         try:
-            analyzer = ChordDiagramAnalyzer(cleaned_file)
+            analyzer = ChordDiagramAnalyzer(cleaned_file, sample_rate=sample_rate)
             analyzer.load_data()
             analyzer.analyze_transitions()
             chord_fig = analyzer.create_chord_diagram(min_value=1)
-            chord_output = os.path.join(output_dir, "chord_diagram.html")
-            chord_fig.write_html(chord_output)
-            chord_fig.show()
+            figures["Diagramme de cordes"] = chord_fig
+            if headless:
+                chord_output = exporter.export(chord_fig, "chord_diagram")
+            else:
+                chord_output = os.path.join(output_dir, "chord_diagram.html")
+                chord_fig.write_html(chord_output)
+                chord_fig.show()
             print(f"Chord diagram saved to: {chord_output}")
         except Exception as e:
             print(f"Error generating chord diagram: {e}")
 
+        if headless and figures:
+            report_output = exporter.write_report(figures)
+            print(f"\nCombined report saved to: {report_output}")
+
         print("\nProcess completed successfully!")
         
     except Exception as e:
         print(f"An error occurred during execution: {e}")
 
+def parse_args(argv=None):
+    """Script options; batch mode is headless unless a terminal is attached or --show is given"""
+    parser = argparse.ArgumentParser(description="Extract, clean and chart app.elzeard.co navigation")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--headless", dest="headless", action="store_true", default=None,
+                      help="Export figures without opening a browser (default when not run from a terminal)")
+    mode.add_argument("--show", dest="headless", action="store_false",
+                      help="Write standalone HTML and open the figures in a browser")
+    parser.add_argument("--format", choices=("html", "json"), default="html", help="Headless export format")
+    parser.add_argument("--gzip", action="store_true", help="Gzip headless exports")
+    parser.add_argument("--sample-rate", type=float, default=None,
+                        help="Keep whole histories for this fraction of users (e.g. 0.01)")
+    args = parser.parse_args(argv)
+    if args.headless is None:
+        args.headless = not sys.stdout.isatty()
+    return args
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    args = parse_args()
+    main(sample_rate=args.sample_rate, headless=args.headless, export_format=args.format, compress=args.gzip)
\ No newline at end of file